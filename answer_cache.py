@@ -0,0 +1,54 @@
+"""On-disk cache of final answers for repeated questions."""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class AnswerCache:
+    """SQLite-backed cache mapping a normalized query to its final answer."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Queries may run on any thread, so share the connection under a lock
+        self._conn = sqlite3.connect(str(self.cache_dir / "answers.sqlite3"), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(question: str, llm_name: str, top_k: int, system_prompt: str) -> str:
+        """Return the cache key for a question asked with the given settings."""
+        normalized = " ".join(question.lower().split())
+        raw = f"{llm_name}\0{top_k}\0{system_prompt}\0{normalized}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached answer for key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, answer: str) -> None:
+        """Store an answer under key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer) VALUES (?, ?)",
+                (key, answer)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Drop all cached answers, e.g. after the index changes."""
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,130 @@
+"""Content-defined chunking using the Gear rolling hash.
+
+Chunk boundaries depend only on the bytes around them, so an edit early in
+a file does not shift every later boundary the way fixed offsets do. That
+keeps unchanged chunks byte-identical across edits and lets the embedding
+cache serve them.
+"""
+
+from typing import Generator
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Fixed seed so boundaries are stable across runs and machines
+GEAR_TABLE = np.random.default_rng(0).integers(0, 2**64, 256, dtype=np.uint64)
+
+# Each Gear step shifts the hash left by one bit, so a hash only depends on
+# the last 64 bytes.
+_WINDOW = 64
+
+# Bytes hashed per numpy pass, bounding the size of temporary arrays
+_BLOCK_SIZE = 1 << 20
+
+
+def _gear_hashes(buf: np.ndarray) -> np.ndarray:
+    """Compute the Gear hash ending at every byte of buf.
+
+    H[i] = sum(GEAR_TABLE[buf[i - j]] << j for j in 0..63), which equals the
+    sequential update H = (H << 1) + GEAR_TABLE[byte] modulo 2**64.
+    """
+    values = GEAR_TABLE[buf]
+    hashes = np.zeros(len(buf), dtype=np.uint64)
+    for j in range(min(_WINDOW, len(buf))):
+        hashes[j:] += values[:len(buf) - j] << np.uint64(j)
+    return hashes
+
+
+def _candidate_cuts(buf: np.ndarray, mask: np.uint64) -> Generator[int, None, None]:
+    """Yield every cut position whose preceding hash has the mask bits clear."""
+    for block_start in range(0, len(buf), _BLOCK_SIZE):
+        lookback = max(0, block_start - (_WINDOW - 1))
+        hashes = _gear_hashes(buf[lookback:block_start + _BLOCK_SIZE])
+        hits = np.flatnonzero((hashes[block_start - lookback:] & mask) == 0)
+        # A hit at byte i means a cut after it
+        yield from (hits + block_start + 1).tolist()
+
+
+def _gear_bounds_loop(buf, gear_table, min_size, max_size, mask):
+    """Sequential Gear scan returning chunk end offsets as an int64 array.
+
+    Only used when compiled with Numba; interpreted, it is far slower than
+    the vectorized numpy path.
+    """
+    # Every chunk but the last is at least min_size bytes
+    out = np.empty(len(buf) // min_size + 1, dtype=np.int64)
+    count = 0
+    last = 0
+    h = np.uint64(0)
+    one = np.uint64(1)
+    zero = np.uint64(0)
+    for i in range(len(buf)):
+        h = (h << one) + gear_table[buf[i]]
+        length = i + 1 - last
+        if length >= min_size and ((h & mask) == zero or length >= max_size):
+            out[count] = i + 1
+            count += 1
+            last = i + 1
+    if last < len(buf):
+        out[count] = len(buf)
+        count += 1
+    return out[:count]
+
+
+_gear_bounds_jit = (
+    njit(cache=True, boundscheck=False, nogil=True)(_gear_bounds_loop) if njit else None
+)
+
+
+def gear_boundaries(data: bytes, min_size: int, avg_size: int, max_size: int) -> list[int]:
+    """Return the end offsets of content-defined chunks of data.
+
+    A boundary is placed where the top log2(avg_size) bits of the hash are
+    zero, subject to chunks being at least min_size and at most max_size
+    bytes. The last offset is always len(data).
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    n = len(buf)
+    bits = max(1, int(avg_size).bit_length() - 1)
+    mask = np.uint64(((1 << bits) - 1) << (64 - bits))
+
+    if _gear_bounds_jit is not None and n:
+        return _gear_bounds_jit(buf, GEAR_TABLE, max(1, min_size), max_size, mask).tolist()
+
+    # Vectorized fallback: find all hash hits in numpy, then apply the
+    # size limits in a Python pass over the (much fewer) candidates
+    cuts = []
+    last = 0
+    for cut in _candidate_cuts(buf, mask):
+        if cut - last < min_size:
+            continue
+        while cut - last > max_size:
+            last += max_size
+            cuts.append(last)
+        if cut - last >= min_size:
+            cuts.append(cut)
+            last = cut
+
+    while n - last > max_size:
+        last += max_size
+        cuts.append(last)
+    if last < n:
+        cuts.append(n)
+    return cuts
+
+
+def chunk_text(text: str, min_size: int, avg_size: int, max_size: int) -> Generator[str, None, None]:
+    """Split text into content-defined chunks sized in UTF-8 bytes."""
+    data = text.encode("utf-8")
+    start = 0
+    for end in gear_boundaries(data, min_size, avg_size, max_size):
+        # Never split a multi-byte character: move to the next lead byte
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end += 1
+        if end > start:
+            yield data[start:end].decode("utf-8")
+            start = end
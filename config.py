@@ -15,13 +15,33 @@ class Config:
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
 
+    # HTTP client settings for API providers
+    HTTP_TIMEOUT: float = 600.0
+    HTTP_MAX_CONNECTIONS: int = 64
+
     # Defaults
     DEFAULT_LLM: str = os.getenv("DEFAULT_LLM", "anthropic")
     DEFAULT_EMBEDDING: str = os.getenv("DEFAULT_EMBEDDING", "local")
 
+    # Local embedding backend: "torch" (sentence-transformers) or "onnx" (INT8)
+    LOCAL_EMBEDDING_BACKEND: str = os.getenv("LOCAL_EMBEDDING_BACKEND", "torch")
+
     # Embedding models
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     LOCAL_EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 128
+
+    # Concurrent OpenAI embedding requests, and retries after a 429
+    OPENAI_EMBEDDING_CONCURRENCY: int = 8
+    OPENAI_RATE_LIMIT_RETRIES: int = 5
+
+    # Per-request limits used when packing OpenAI embedding batches
+    OPENAI_EMBEDDING_MAX_BATCH_TOKENS: int = 250_000
+    OPENAI_EMBEDDING_MAX_BATCH_ITEMS: int = 2048
+
+    # Texts passed to one OpenAI embed_texts call while indexing; enough to
+    # pack several requests for the concurrent senders
+    OPENAI_EMBEDDING_BATCH_SIZE: int = 8192
 
     # LLM models
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
@@ -31,9 +51,51 @@ class Config:
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
 
+    # Content-defined chunking (sizes in UTF-8 bytes), used instead of fixed
+    # offsets for texts longer than CDC_THRESHOLD characters. Chunks average
+    # about CDC_MIN_SIZE + CDC_AVG_SIZE, which is kept near CHUNK_SIZE
+    CDC_THRESHOLD: int = 4096
+    CDC_MIN_SIZE: int = 512
+    CDC_AVG_SIZE: int = 512
+    CDC_MAX_SIZE: int = 2048
+
+    # Number of parallel workers used to parse files
+    LOADER_WORKERS: int = os.cpu_count() or 4
+
+    # Minimum number of chunks handed to the vector store at a time while
+    # indexing; raised to the embedding service's batch size if larger
+    INDEX_BATCH_SIZE: int = 256
+
+    # Vector store backend: "chroma", "usearch" (in-memory HNSW, needs
+    # usearch) or "exact" (brute-force numpy search, for small corpora)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
+
+    # Scalar type of vectors in the usearch index: "f32", "f16" (half the
+    # memory, near-identical results) or "i8" (a quarter, slightly lossy)
+    USEARCH_DTYPE: str = os.getenv("USEARCH_DTYPE", "f16")
+
+    # Embedded chunks written to the vector store per insert, and inserts
+    # run concurrently for stores that allow it
+    INSERT_BATCH_SIZE: int = 512
+    INSERT_WORKERS: int = 4
+
+    # HNSW index parameters; applied when the index is created, so
+    # changing them requires rebuilding the index
+    HNSW_M: int = 24
+    HNSW_EF_CONSTRUCTION: int = 128
+    HNSW_EF_SEARCH: int = 100
+    HNSW_NUM_THREADS: int = os.cpu_count() or 1
+
+    # Below this many vectors the usearch backend scores every vector
+    # instead of walking the HNSW graph
+    HNSW_MIN_DOCS: int = 10_000
+
     # RAG settings
     TOP_K_RESULTS: int = 5
 
+    # Number of query embeddings kept in memory per vector store
+    QUERY_CACHE_SIZE: int = 1024
+
     # File extensions
     TEXT_EXTENSIONS: set = {".txt", ".md", ".markdown"}
     CODE_EXTENSIONS: set = {
@@ -48,6 +110,9 @@ class Config:
 
     # Index folder name
     INDEX_FOLDER: str = ".rag_index"
+    EMBEDDING_CACHE_FOLDER: str = "embcache"
+    ANSWER_CACHE_FOLDER: str = "qa_cache"
+    MANIFEST_FILE: str = "manifest.json"
     INSTRUCTIONS_FILE: str = "instructions.txt"
 
     @classmethod
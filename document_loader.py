@@ -1,23 +1,52 @@
 """Document loading and text chunking utilities."""
 
+import hashlib
+import multiprocessing
 import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Generator
 from dataclasses import dataclass
 
+import chunker
 from config import Config
 
+# Computed once; membership tests against a frozenset are a single hash probe
+SUPPORTED_EXTENSIONS = frozenset(Config.get_supported_extensions())
+_PROCESS_POOL_EXTENSIONS = frozenset(Config.PDF_EXTENSIONS | Config.DOCX_EXTENSIONS)
 
-@dataclass
+
+def _extension(name: str) -> str:
+    """Return the lowercased extension of a file name, like Path.suffix."""
+    stem, dot, ext = name.rpartition(".")
+    if not stem or not dot:
+        return ""
+    return "." + ext.lower()
+
+
+@dataclass(slots=True)
 class Document:
     """Represents a document chunk."""
     content: str
-    metadata: dict
+    source: str
+    chunk_index: int
+    file_type: str
 
     @property
     def id(self) -> str:
         """Generate unique ID for the document chunk."""
-        return f"{self.metadata['source']}_{self.metadata['chunk_index']}"
+        return f"{self.source}_{self.chunk_index}"
+
+    @property
+    def metadata(self) -> dict:
+        """Metadata stored alongside the chunk in the vector store."""
+        return {
+            "source": self.source,
+            "chunk_index": self.chunk_index,
+            "file_type": self.file_type,
+        }
 
 
 class DocumentLoader:
@@ -25,33 +54,113 @@ class DocumentLoader:
 
     def __init__(self, folder_path: str):
         self.folder_path = Path(folder_path).resolve()
-        self.supported_extensions = Config.get_supported_extensions()
+        self.supported_extensions = SUPPORTED_EXTENSIONS
+        # Paths that could not be loaded by the last iter_documents() run
+        self.failed: list[str] = []
 
     def load_all(self) -> list[Document]:
         """Load all supported documents from the folder."""
-        documents = []
+        return list(self.iter_documents())
+
+    def scan(self) -> dict[str, tuple[str, list]]:
+        """Map each supported file's source name to its path and fingerprint."""
+        files = {}
         for file_path in self._get_files():
             try:
-                docs = self._load_file(file_path)
-                documents.extend(docs)
-            except Exception as e:
-                print(f"Warning: Could not load {file_path}: {e}")
+                files[self._source_name(Path(file_path))] = (file_path, self.fingerprint(file_path))
+            except OSError as e:
+                print(f"Warning: Could not read {file_path}: {e}")
+        return files
+
+    @staticmethod
+    def fingerprint(file_path: str) -> list:
+        """Return [mtime_ns, size, sha256 of the first and last 4 KiB] for a file."""
+        stat = os.stat(file_path)
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            digest.update(f.read(4096))
+            if stat.st_size > 8192:
+                f.seek(-4096, os.SEEK_END)
+            digest.update(f.read(4096))
+        return [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+
+    def iter_documents(self, paths: list[str] = None) -> Generator[Document, None, None]:
+        """Stream document chunks from the given files, or all supported files.
+
+        Files are parsed in parallel: PDF and DOCX extraction is CPU-bound
+        (and PDFium is not thread-safe), so those go to a process pool, while
+        text files are IO-bound and go to a thread pool. Only a bounded number
+        of files is in flight at once, and chunks are yielded in walk order.
+        Files that fail to load are skipped and listed in self.failed.
+        """
+        max_pending = Config.LOADER_WORKERS * 2
+        pending = deque()
+        process_pool = None
+        self.failed = []
+
+        with ThreadPoolExecutor(max_workers=Config.LOADER_WORKERS) as thread_pool:
+            try:
+                for file_path in (self._get_files() if paths is None else paths):
+                    if _extension(file_path) in _PROCESS_POOL_EXTENSIONS:
+                        if process_pool is None:
+                            # By now the parent runs loader, client and embedding
+                            # threads; forking it could deadlock the workers
+                            process_pool = ProcessPoolExecutor(
+                                max_workers=Config.LOADER_WORKERS,
+                                mp_context=multiprocessing.get_context("spawn")
+                            )
+                        future = process_pool.submit(self._load_file_safe, file_path)
+                    else:
+                        future = thread_pool.submit(self._load_file_safe, file_path)
+                    pending.append((file_path, future))
+
+                    if len(pending) >= max_pending:
+                        yield from self._result(*pending.popleft())
+
+                while pending:
+                    yield from self._result(*pending.popleft())
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                if process_pool is not None:
+                    process_pool.shutdown()
+
+    def _result(self, file_path: str, future) -> list[Document]:
+        """Return a loaded file's chunks, recording it in self.failed if it failed."""
+        documents = future.result()
+        if documents is None:
+            self.failed.append(file_path)
+            return []
         return documents
 
-    def _get_files(self) -> Generator[Path, None, None]:
-        """Recursively get all supported files."""
-        for root, _, files in os.walk(self.folder_path):
-            root_path = Path(root)
-            # Skip index folder
-            if Config.INDEX_FOLDER in root_path.parts:
-                continue
-            for file in files:
-                file_path = root_path / file
-                if file_path.suffix.lower() in self.supported_extensions:
-                    yield file_path
-
-    def _load_file(self, file_path: Path) -> list[Document]:
-        """Load a single file and return document chunks."""
+    def _load_file_safe(self, file_path: str) -> list[Document] | None:
+        """Load a single file, reporting failures and returning None instead of raising."""
+        try:
+            return list(self._load_file(file_path))
+        except Exception as e:
+            print(f"Warning: Could not load {file_path}: {e}")
+            return None
+
+    def _get_files(self) -> Generator[str, None, None]:
+        """Recursively get the paths of all supported files."""
+        return self._walk(str(self.folder_path))
+
+    def _walk(self, directory: str) -> Generator[str, None, None]:
+        """Walk a directory with os.scandir, never descending into the index."""
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != Config.INDEX_FOLDER:
+                            yield from self._walk(entry.path)
+                    elif entry.is_file() and _extension(entry.name) in self.supported_extensions:
+                        yield entry.path
+        except OSError:
+            return
+
+    def _load_file(self, file_path: str) -> Generator[Document, None, None]:
+        """Load a single file and yield its document chunks."""
+        file_path = Path(file_path)
         suffix = file_path.suffix.lower()
 
         if suffix in Config.TEXT_EXTENSIONS or suffix in Config.CODE_EXTENSIONS:
@@ -61,40 +170,41 @@ class DocumentLoader:
         elif suffix in Config.DOCX_EXTENSIONS:
             content = self._load_docx_file(file_path)
         else:
-            return []
+            return
 
         if not content.strip():
-            return []
+            return
 
-        return self._chunk_text(content, file_path)
+        yield from self._chunk_text(content, file_path)
 
     def _load_text_file(self, file_path: Path) -> str:
-        """Load a text or code file."""
-        encodings = ["utf-8", "utf-8-sig", "latin-1", "cp1252"]
-        for encoding in encodings:
-            try:
-                return file_path.read_text(encoding=encoding)
-            except UnicodeDecodeError:
-                continue
-        return ""
+        """Load a text or code file, reading it from disk only once."""
+        data = file_path.read_bytes()
+        try:
+            return data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return data.decode("cp1252", errors="replace")
 
     def _load_pdf_file(self, file_path: Path) -> str:
-        """Load a PDF file."""
+        """Load a PDF file using PDFium's native text extraction."""
         try:
-            from pypdf import PdfReader
-            reader = PdfReader(file_path)
-            text_parts = []
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
+            import pypdfium2 as pdfium
+            pdf = pdfium.PdfDocument(str(file_path))
+            try:
+                text_parts = []
+                for i in range(len(pdf)):
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                    if text:
+                        text_parts.append(text.replace("\r\n", "\n"))
+            finally:
+                pdf.close()
             return "\n\n".join(text_parts)
-        except ImportError:
-            print("Warning: pypdf not installed. Cannot load PDF files.")
-            return ""
-        except Exception as e:
-            print(f"Warning: Could not read PDF {file_path}: {e}")
-            return ""
+        except ImportError as e:
+            raise ImportError("pypdfium2 not installed. Cannot load PDF files.") from e
 
     def _load_docx_file(self, file_path: Path) -> str:
         """Load a DOCX file."""
@@ -106,46 +216,44 @@ class DocumentLoader:
                 if paragraph.text.strip():
                     text_parts.append(paragraph.text)
             return "\n\n".join(text_parts)
-        except ImportError:
-            print("Warning: python-docx not installed. Cannot load DOCX files.")
-            return ""
-        except Exception as e:
-            print(f"Warning: Could not read DOCX {file_path}: {e}")
-            return ""
+        except ImportError as e:
+            raise ImportError("python-docx not installed. Cannot load DOCX files.") from e
 
-    def _chunk_text(self, text: str, file_path: Path) -> list[Document]:
+    def _source_name(self, file_path: Path) -> str:
+        """Return the file's path relative to the folder, used as its source."""
+        try:
+            return str(file_path.relative_to(self.folder_path))
+        except ValueError:
+            return file_path.name
+
+    def _chunk_text(self, text: str, file_path: Path) -> Generator[Document, None, None]:
         """Split text into overlapping chunks."""
-        chunks = []
         chunk_size = Config.CHUNK_SIZE
         chunk_overlap = Config.CHUNK_OVERLAP
 
-        # Get relative path from folder
-        try:
-            relative_path = file_path.relative_to(self.folder_path)
-        except ValueError:
-            relative_path = file_path.name
-
-        start = 0
-        chunk_index = 0
+        # Interned once per file so all chunks share the same string objects
+        source = sys.intern(self._source_name(file_path))
+        file_type = sys.intern(file_path.suffix.lower())
 
-        while start < len(text):
-            end = start + chunk_size
-            chunk_text = text[start:end]
+        if len(text) > Config.CDC_THRESHOLD:
+            # Content-defined boundaries survive edits, so unchanged chunks
+            # keep hitting the embedding cache
+            pieces = chunker.chunk_text(
+                text, Config.CDC_MIN_SIZE, Config.CDC_AVG_SIZE, Config.CDC_MAX_SIZE
+            )
+        else:
+            # Chunk i covers text[i*step : i*step + chunk_size]
+            step = max(1, chunk_size - chunk_overlap)
+            pieces = (text[start:start + chunk_size] for start in range(0, len(text), step))
 
+        for chunk_index, chunk_text in enumerate(pieces):
             if chunk_text.strip():
-                chunks.append(Document(
+                yield Document(
                     content=chunk_text,
-                    metadata={
-                        "source": str(relative_path),
-                        "chunk_index": chunk_index,
-                        "file_type": file_path.suffix.lower(),
-                    }
-                ))
-
-            start = end - chunk_overlap
-            chunk_index += 1
-
-        return chunks
+                    source=source,
+                    chunk_index=chunk_index,
+                    file_type=file_type
+                )
 
 
 def get_instructions(folder_path: str) -> str | None:
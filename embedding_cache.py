@@ -0,0 +1,66 @@
+"""Content-addressed on-disk cache for embedding vectors."""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """SQLite-backed cache mapping hash(model, text) to a float32 vector."""
+
+    # Stay well below SQLite's bound-parameter limit on older builds
+    _QUERY_BATCH = 500
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Embedding may run on any thread, so share the connection under a lock
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "embeddings.sqlite3"), check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> bytes:
+        """Return the cache key for a text embedded with the given model."""
+        return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=32).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Look up cached vectors, returning only the keys that were found."""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique_keys), self._QUERY_BATCH):
+                batch = unique_keys[i:i + self._QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, keys: list[bytes], vectors) -> None:
+        """Store vectors under their keys, replacing existing entries."""
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in zip(keys, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,107 +1,287 @@
 """Embedding services for text vectorization."""
 
+import random
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import List
 
+import numpy as np
+
 from config import Config
+from embedding_cache import EmbeddingCache
 
 
 class EmbeddingService(ABC):
     """Abstract base class for embedding services."""
 
+    model_name: str
+    cache: EmbeddingCache | None = None
+
+    # Number of texts worth passing to one embed_texts call
+    batch_size: int = 256
+
     @abstractmethod
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Embed a list of texts and return their vectors."""
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed a list of texts and return a float32 array of shape (N, dim)."""
         pass
 
     @abstractmethod
-    def embed_query(self, query: str) -> list[float]:
-        """Embed a single query text."""
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a single query text as a float32 array of shape (dim,)."""
         pass
 
+    def embed_queries(self, queries: list[str]) -> np.ndarray:
+        """Embed several query texts at once, bypassing the embedding cache."""
+        if len(queries) == 1:
+            return self.embed_query(queries[0])[np.newaxis]
+        return self._embed_uncached(queries)
+
     @property
     @abstractmethod
     def dimension(self) -> int:
         """Return the embedding dimension."""
         pass
 
+    @abstractmethod
+    def _embed_uncached(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with the underlying model, bypassing the cache."""
+        pass
+
+    def _dedup_embed(self, texts: list[str]) -> np.ndarray:
+        """Embed each distinct text once and copy its vector to every occurrence."""
+        # dicts keep insertion order, so keys line up with the indices handed out
+        positions = {}
+        inverse = [positions.setdefault(text, len(positions)) for text in texts]
+
+        if len(positions) == len(texts):
+            return self._embed_with_cache(texts)
+        return self._embed_with_cache(list(positions))[inverse]
+
+    def _embed_with_cache(self, texts: list[str]) -> np.ndarray:
+        """Embed texts, sending only cache misses to the model."""
+        if self.cache is None:
+            return self._embed_uncached(texts)
+
+        keys = [self.cache.key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        # Fill one contiguous array: cached rows first, then misses in a block
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        missing_idx = []
+        for i, key in enumerate(keys):
+            vector = vectors.get(key)
+            if vector is None:
+                missing_idx.append(i)
+            else:
+                embeddings[i] = vector
+
+        if missing_idx:
+            computed = self._embed_uncached([texts[i] for i in missing_idx])
+            self.cache.put_many([keys[i] for i in missing_idx], computed)
+            embeddings[missing_idx] = computed
+
+        return embeddings
+
+
+@lru_cache(maxsize=None)
+def _get_token_encoder(model: str):
+    """Return the cached tiktoken encoder for a model, or None if unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
 
 class OpenAIEmbedding(EmbeddingService):
     """OpenAI embedding service."""
 
     def __init__(self):
         from openai import OpenAI
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        from http_client import get_http_client
+        self.client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=get_http_client())
         self.model = Config.OPENAI_EMBEDDING_MODEL
+        self.model_name = self.model
+        self.batch_size = Config.OPENAI_EMBEDDING_BATCH_SIZE
         self._dimension = 1536  # text-embedding-3-small dimension
+        self._executor: ThreadPoolExecutor | None = None
 
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
         """Embed a list of texts using OpenAI API."""
         if not texts:
-            return []
-
-        # Process in batches of 100
-        all_embeddings = []
-        batch_size = 100
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return self._dedup_embed(texts)
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=batch
+    def _embed_uncached(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with the OpenAI API, sending several batches at once."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=Config.OPENAI_EMBEDDING_CONCURRENCY, thread_name_prefix="openai-embed"
             )
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
+        batches = self._pack_batches(texts)
+        results = self._executor.map(
+            self._create_with_backoff, [[texts[i] for i in batch] for batch in batches]
+        )
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for batch, batch_embeddings in zip(batches, results):
+            embeddings[batch] = batch_embeddings
+        return embeddings
+
+    def _pack_batches(self, texts: list[str]) -> list[list[int]]:
+        """Pack text indices into requests by token count (First-Fit-Decreasing).
+
+        Each request stays under the per-request token and input limits while
+        filling as close to them as possible, minimizing round-trips.
+        """
+        token_counts = self._count_tokens(texts)
+        max_tokens = Config.OPENAI_EMBEDDING_MAX_BATCH_TOKENS
+        max_items = Config.OPENAI_EMBEDDING_MAX_BATCH_ITEMS
+
+        bins = []  # [tokens used, indices]
+        for i in sorted(range(len(texts)), key=token_counts.__getitem__, reverse=True):
+            for bin_ in bins:
+                if bin_[0] + token_counts[i] <= max_tokens and len(bin_[1]) < max_items:
+                    bin_[0] += token_counts[i]
+                    bin_[1].append(i)
+                    break
+            else:
+                bins.append([token_counts[i], [i]])
 
-        return all_embeddings
+        return [indices for _, indices in bins]
 
-    def embed_query(self, query: str) -> list[float]:
+    def _count_tokens(self, texts: list[str]) -> list[int]:
+        """Count tokens per text, estimating when tiktoken is unavailable."""
+        encoder = _get_token_encoder(self.model)
+        if encoder is None:
+            # Roughly four characters per token for English text and code
+            return [len(text) // 4 + 1 for text in texts]
+        return [len(tokens) for tokens in encoder.encode_ordinary_batch(texts)]
+
+    def _create_with_backoff(self, batch: list[str]) -> np.ndarray:
+        """Request embeddings for one batch, backing off exponentially on 429s."""
+        from openai import RateLimitError
+
+        for attempt in range(Config.OPENAI_RATE_LIMIT_RETRIES + 1):
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=batch
+                )
+                return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+            except RateLimitError:
+                if attempt == Config.OPENAI_RATE_LIMIT_RETRIES:
+                    raise
+                time.sleep(2 ** attempt + random.random())
+
+    def embed_query(self, query: str) -> np.ndarray:
         """Embed a single query text."""
         response = self.client.embeddings.create(
             model=self.model,
             input=query
         )
-        return response.data[0].embedding
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
 
     @property
     def dimension(self) -> int:
         return self._dimension
 
 
+@lru_cache(maxsize=4)
+def _load_sentence_transformer(model_name: str, device: str):
+    """Load a SentenceTransformer once per process and reuse it."""
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        # Half precision roughly doubles GPU throughput
+        model.half()
+    return model
+
+
+@lru_cache(maxsize=4)
+def _load_onnx_encoder(model_name: str):
+    """Load the quantized ONNX encoder once per process and reuse it."""
+    from onnx_encoder import OnnxSentenceEncoder
+    return OnnxSentenceEncoder(model_name)
+
+
 class LocalEmbedding(EmbeddingService):
     """Local embedding service using sentence-transformers."""
 
     def __init__(self):
-        from sentence_transformers import SentenceTransformer
-        self.model = SentenceTransformer(Config.LOCAL_EMBEDDING_MODEL)
+        if Config.LOCAL_EMBEDDING_BACKEND == "onnx":
+            # INT8-quantized model on ONNX Runtime, for fast CPU inference
+            self.device = "cpu"
+            self.model = _load_onnx_encoder(Config.LOCAL_EMBEDDING_MODEL)
+            # Quantized vectors differ slightly, so keep their cache entries apart
+            self.model_name = f"{Config.LOCAL_EMBEDDING_MODEL}-onnx-int8"
+        else:
+            self.device = self._detect_device()
+            self.model = _load_sentence_transformer(Config.LOCAL_EMBEDDING_MODEL, self.device)
+            self.model_name = Config.LOCAL_EMBEDDING_MODEL
         self._dimension = self.model.get_sentence_embedding_dimension()
+        self.batch_size = Config.LOCAL_EMBEDDING_BATCH_SIZE
+
+    @staticmethod
+    def _detect_device() -> str:
+        """Pick the fastest available torch device."""
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        if torch.backends.mps.is_available():
+            return "mps"
+        return "cpu"
 
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
         """Embed a list of texts using local model."""
         if not texts:
-            return []
-        embeddings = self.model.encode(texts, show_progress_bar=True)
-        return embeddings.tolist()
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return self._dedup_embed(texts)
 
-    def embed_query(self, query: str) -> list[float]:
+    def _embed_uncached(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with the sentence-transformers model."""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=Config.LOCAL_EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+    def embed_query(self, query: str) -> np.ndarray:
         """Embed a single query text."""
-        embedding = self.model.encode(query)
-        return embedding.tolist()
+        embedding = self.model.encode(query, normalize_embeddings=True)
+        return embedding.astype(np.float32, copy=False)
 
     @property
     def dimension(self) -> int:
         return self._dimension
 
 
-def get_embedding_service(provider: str = None) -> EmbeddingService:
-    """Factory function to get the appropriate embedding service."""
+def get_embedding_service(provider: str = None, cache_dir: Path = None) -> EmbeddingService:
+    """Factory function to get the appropriate embedding service.
+
+    If cache_dir is given, embeddings are cached on disk there so unchanged
+    chunks are not re-embedded on reindex.
+    """
     provider = provider or Config.DEFAULT_EMBEDDING
 
     if provider == "openai":
         if not Config.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is required for OpenAI embeddings")
-        return OpenAIEmbedding()
+        service = OpenAIEmbedding()
     elif provider == "local":
-        return LocalEmbedding()
+        service = LocalEmbedding()
     else:
         raise ValueError(f"Unknown embedding provider: {provider}")
+
+    if cache_dir is not None:
+        service.cache = EmbeddingCache(cache_dir)
+    return service
@@ -0,0 +1,35 @@
+"""Shared HTTP client for the API-backed services."""
+
+import atexit
+from functools import lru_cache
+
+import httpx
+
+from config import Config
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client, creating it on first use.
+
+    Sharing one client lets every OpenAI and Anthropic request reuse
+    keep-alive connections instead of paying a new TLS handshake.
+    """
+    limits = httpx.Limits(
+        max_connections=Config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.HTTP_MAX_CONNECTIONS
+    )
+    try:
+        client = httpx.Client(
+            http2=True,
+            timeout=Config.HTTP_TIMEOUT,
+            limits=limits,
+            follow_redirects=True
+        )
+    except ImportError:
+        # HTTP/2 needs the optional h2 package
+        client = httpx.Client(timeout=Config.HTTP_TIMEOUT, limits=limits, follow_redirects=True)
+
+    atexit.register(client.close)
+    return client
+
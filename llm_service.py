@@ -31,7 +31,11 @@ class AnthropicLLM(LLMService):
 
     def __init__(self):
         import anthropic
-        self.client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+        from http_client import get_http_client
+        self.client = anthropic.Anthropic(
+            api_key=Config.ANTHROPIC_API_KEY,
+            http_client=get_http_client()
+        )
         self.model = Config.ANTHROPIC_MODEL
 
     def generate(self, prompt: str, system_prompt: str = None) -> str:
@@ -42,7 +46,7 @@ class AnthropicLLM(LLMService):
             "messages": [{"role": "user", "content": prompt}]
         }
         if system_prompt:
-            kwargs["system"] = system_prompt
+            kwargs["system"] = self._cached_system(system_prompt)
 
         response = self.client.messages.create(**kwargs)
         return response.content[0].text
@@ -55,12 +59,21 @@ class AnthropicLLM(LLMService):
             "messages": [{"role": "user", "content": prompt}]
         }
         if system_prompt:
-            kwargs["system"] = system_prompt
+            kwargs["system"] = self._cached_system(system_prompt)
 
         with self.client.messages.stream(**kwargs) as stream:
             for text in stream.text_stream:
                 yield text
 
+    @staticmethod
+    def _cached_system(system_prompt: str) -> list[dict]:
+        """Mark the system prompt as a cacheable prefix for prompt caching."""
+        return [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
+
     @property
     def name(self) -> str:
         return f"Anthropic ({self.model})"
@@ -71,7 +84,8 @@ class OpenAILLM(LLMService):
 
     def __init__(self):
         from openai import OpenAI
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        from http_client import get_http_client
+        self.client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=get_http_client())
         self.model = Config.OPENAI_MODEL
 
     def generate(self, prompt: str, system_prompt: str = None) -> str:
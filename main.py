@@ -69,7 +69,7 @@ def index(folder: str, embedding: str, rebuild: bool):
         if engine.is_indexed() and not rebuild:
             count = engine.document_count()
             console.print(f"[yellow]Index already exists with {count} chunks.[/yellow]")
-            if not click.confirm("Rebuild index?"):
+            if not click.confirm("Update index with new and changed files?"):
                 return
 
         with Progress(
@@ -82,6 +82,8 @@ def index(folder: str, embedding: str, rebuild: bool):
 
         if chunk_count > 0:
             console.print(f"\n[green]Successfully indexed {chunk_count} document chunks.[/green]")
+        elif engine.document_count() > 0:
+            console.print("\n[green]Index is up to date.[/green]")
         else:
             console.print("\n[yellow]No documents found to index.[/yellow]")
 
@@ -92,7 +94,13 @@ def index(folder: str, embedding: str, rebuild: bool):
 
 @cli.command()
 @click.argument("folder", callback=validate_folder)
-@click.argument("question")
+@click.argument("question", required=False)
+@click.option(
+    "--file", "-f", "questions_file",
+    type=click.File("r", encoding="utf-8"),
+    default=None,
+    help="Answer every question in a file (one per line) with one loaded engine"
+)
 @click.option(
     "--llm", "-l",
     type=click.Choice(["anthropic", "openai"]),
@@ -105,14 +113,22 @@ def index(folder: str, embedding: str, rebuild: bool):
     default=None,
     help="Embedding provider (default: from config or 'local')"
 )
-def query(folder: str, question: str, llm: str, embedding: str):
-    """Ask a single question about the indexed documents.
+def query(folder: str, question: str, questions_file, llm: str, embedding: str):
+    """Ask a question about the indexed documents.
 
     FOLDER is the path to the indexed directory.
     QUESTION is your question about the documents.
+
+    Use --file to ask many questions in one run; models are loaded only once.
     """
     from rag_engine import RAGEngine
 
+    questions = [question] if question else []
+    if questions_file:
+        questions.extend(line.strip() for line in questions_file if line.strip())
+    if not questions:
+        raise click.UsageError("Provide a QUESTION or --file with questions.")
+
     try:
         with Progress(
             SpinnerColumn(),
@@ -128,15 +144,19 @@ def query(folder: str, question: str, llm: str, embedding: str):
 
         console.print(f"\n[bold]Using:[/bold] {engine.llm_service.name}\n")
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            progress.add_task("Thinking...", total=None)
-            response = engine.query(question, stream=False)
+        for question in questions:
+            if len(questions) > 1:
+                console.print(f"[bold cyan]Q:[/bold cyan] {question}")
+
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                progress.add_task("Thinking...", total=None)
+                response = engine.query(question, stream=False)
 
-        console.print(Panel(Markdown(response), title="Answer", border_style="green"))
+            console.print(Panel(Markdown(response), title="Answer", border_style="green"))
 
     except Exception as e:
         console.print(f"\n[red]Error:[/red] {e}")
@@ -246,9 +266,9 @@ def status(folder: str):
     if index_path.exists():
         try:
             from embeddings import get_embedding_service
-            from vector_store import VectorStore
+            from vector_store import get_vector_store
             embedding_service = get_embedding_service("local")
-            store = VectorStore(folder, embedding_service)
+            store = get_vector_store(folder, embedding_service)
             count = store.count()
             console.print(f"[green]Index exists:[/green] {count} document chunks")
         except Exception as e:
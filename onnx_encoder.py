@@ -0,0 +1,110 @@
+"""INT8-quantized ONNX Runtime encoder for sentence-transformers models."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+CACHE_ROOT = Path.home() / ".cache" / "rag-app"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+
+def _hub_id(model_name: str) -> str:
+    """Map a short sentence-transformers name to its Hugging Face Hub id."""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def export_int8(model_name: str, save_dir: Path) -> None:
+    """Export a model to ONNX and dynamically quantize its weights to INT8."""
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise ImportError(
+            "The ONNX embedding backend requires: pip install optimum[onnxruntime]"
+        ) from e
+
+    model_id = _hub_id(model_name)
+    model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantization_config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=save_dir, quantization_config=quantization_config)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(save_dir)
+
+
+class OnnxSentenceEncoder:
+    """Mean-pooled sentence encoder running a quantized model on ONNX Runtime.
+
+    Mirrors the parts of the SentenceTransformer API used by LocalEmbedding.
+    The quantized model is exported once and cached under
+    ~/.cache/rag-app/<model>-int8/.
+    """
+
+    def __init__(self, model_name: str, max_seq_length: int = 256):
+        save_dir = CACHE_ROOT / f"{model_name.split('/')[-1]}-int8"
+        if not (save_dir / QUANTIZED_MODEL_FILE).exists():
+            export_int8(model_name, save_dir)
+
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count() or 1
+        self.session = ort.InferenceSession(
+            str(save_dir / QUANTIZED_MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        self.max_seq_length = max_seq_length
+        self._input_names = {node.name for node in self.session.get_inputs()}
+        self._dimension = int(self.encode(["dimension probe"]).shape[1])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Return the embedding dimension."""
+        return self._dimension
+
+    def encode(
+        self,
+        sentences: str | list[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """Embed one sentence or a list of sentences as float32 vectors.
+
+        convert_to_numpy and show_progress_bar are accepted for compatibility
+        with SentenceTransformer.encode; output is always a numpy array.
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            features = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            inputs = {
+                name: values.astype(np.int64)
+                for name, values in features.items()
+                if name in self._input_names
+            }
+            hidden = self.session.run(None, inputs)[0]
+
+            # Mean-pool over real tokens only
+            mask = features["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32, copy=False))
+
+        embeddings = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
@@ -1,11 +1,15 @@
 """RAG engine that orchestrates the retrieval-augmented generation pipeline."""
 
+import json
+from concurrent.futures import Future
+from pathlib import Path
 from typing import Generator
 
+from answer_cache import AnswerCache
 from config import Config
 from document_loader import DocumentLoader, get_instructions
 from embeddings import get_embedding_service, EmbeddingService
-from vector_store import VectorStore
+from vector_store import get_vector_store, VectorStore
 from llm_service import get_llm_service, LLMService
 
 
@@ -23,36 +27,137 @@ class RAGEngine:
         self.embedding_provider = embedding_provider
 
         # Initialize services
-        self.embedding_service: EmbeddingService = get_embedding_service(embedding_provider)
+        self.index_path = Path(folder_path).resolve() / Config.INDEX_FOLDER
+        self.embedding_service: EmbeddingService = get_embedding_service(
+            embedding_provider, cache_dir=self.index_path / Config.EMBEDDING_CACHE_FOLDER
+        )
         self.llm_service: LLMService = get_llm_service(llm_provider)
-        self.vector_store: VectorStore = VectorStore(folder_path, self.embedding_service)
+        self.vector_store: VectorStore = get_vector_store(folder_path, self.embedding_service)
+        self.answer_cache = AnswerCache(self.index_path / Config.ANSWER_CACHE_FOLDER)
 
         # Load instructions if available
         self.instructions = get_instructions(folder_path)
 
+        # The system prompt never changes for an engine, so build it once;
+        # a byte-identical prefix is what provider-side prompt caches key on
+        self._system_prompt = self._build_system_prompt(self.instructions)
+
     def index_documents(self, rebuild: bool = False) -> int:
-        """Index all documents in the folder."""
-        if rebuild:
+        """Index new and changed documents in the folder.
+
+        A manifest of file fingerprints (mtime, size, head/tail hash) is kept
+        in the index folder. Only files whose fingerprint changed are parsed
+        and embedded again, and chunks of deleted files are removed. With
+        rebuild=True, or when the embedding model, chunking or vector
+        backend differ from the last run, the index is cleared and every
+        file is indexed. Returns the number of chunks added.
+        """
+        settings = self._index_settings()
+        manifest_data = self._load_manifest()
+        if manifest_data.get("settings") != settings:
+            # Vectors from another model or chunking cannot be mixed in
+            rebuild = True
+        previous = {} if rebuild else manifest_data.get("files", {})
+        if rebuild or (not previous and self.vector_store.count() > 0):
+            # Without a manifest we cannot tell which chunks are stale
             self.vector_store.clear()
+            self.answer_cache.clear()
 
-        # Load documents
         loader = DocumentLoader(self.folder_path)
-        documents = loader.load_all()
-
-        if not documents:
+        current = loader.scan()
+        manifest = {
+            "settings": settings,
+            "files": {source: fingerprint for source, (_, fingerprint) in current.items()}
+        }
+
+        removed = [source for source in previous if source not in current]
+        changed = [
+            source for source, (_, fingerprint) in current.items()
+            if previous.get(source) != fingerprint
+        ]
+        if not removed and not changed:
+            self._save_manifest(manifest)
             return 0
 
-        # Clear existing and add new
-        if not rebuild and self.vector_store.count() > 0:
-            self.vector_store.clear()
+        # Changed files may now have fewer chunks, so drop their old ones too
+        stale = removed + [source for source in changed if source in previous]
+        if stale:
+            self.vector_store.delete_by_source(stale)
+        self.answer_cache.clear()
+
+        # Stream documents so parsing and embedding overlap, and add them
+        # to the vector store in mini-batches
+        batch_size = max(Config.INDEX_BATCH_SIZE, self.embedding_service.batch_size)
+        indexed = 0
+        batch = []
+        for document in loader.iter_documents([current[source][0] for source in changed]):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                self.vector_store.add_documents(batch)
+                indexed += len(batch)
+                batch = []
+
+        if batch:
+            self.vector_store.add_documents(batch)
+            indexed += len(batch)
+
+        # Leave files that failed to load out of the manifest so the next
+        # run retries them
+        if loader.failed:
+            sources = {file_path: source for source, (file_path, _) in current.items()}
+            for file_path in loader.failed:
+                del manifest["files"][sources[file_path]]
+
+        self.vector_store.persist()
+        self._save_manifest(manifest)
+        return indexed
+
+    def _index_settings(self) -> dict:
+        """Settings that every vector in the index must have been built with."""
+        return {
+            "embedding_model": self.embedding_service.model_name,
+            "dimension": self.embedding_service.dimension,
+            "vector_backend": Config.VECTOR_BACKEND,
+            "chunking": [
+                Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, Config.CDC_THRESHOLD,
+                Config.CDC_MIN_SIZE, Config.CDC_AVG_SIZE, Config.CDC_MAX_SIZE
+            ],
+        }
+
+    def _load_manifest(self) -> dict:
+        """Load the settings and file fingerprints of the last indexing run."""
+        manifest_path = self.index_path / Config.MANIFEST_FILE
+        try:
+            return json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: dict):
+        """Record settings and file fingerprints for the next indexing run."""
+        manifest_path = self.index_path / Config.MANIFEST_FILE
+        manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
 
-        # Add documents to vector store
-        self.vector_store.add_documents(documents)
+    def query(self, question: str, stream: bool = False) -> str | Generator[str, None, None]:
+        """Query the RAG system with a question.
 
-        return len(documents)
+        Answers are cached per question, LLM, top-k and system prompt, so a
+        repeated question skips retrieval and generation entirely.
+        """
+        system_prompt = self._system_prompt
+
+        cache_key = AnswerCache.key(
+            question, self.llm_service.name, Config.TOP_K_RESULTS, system_prompt
+        )
+        cached = self.answer_cache.get(cache_key)
+        if cached is not None:
+            return iter([cached]) if stream else cached
+
+        if stream:
+            # Start retrieval now on a background thread; the stream only
+            # waits for it when the caller asks for the first token
+            search = self.vector_store.search_async(question, top_k=Config.TOP_K_RESULTS)
+            return self._stream_answer(question, search, cache_key)
 
-    def query(self, question: str, stream: bool = False) -> str | Generator[str, None, None]:
-        """Query the RAG system with a question."""
         # Retrieve relevant documents
         results = self.vector_store.search(question, top_k=Config.TOP_K_RESULTS)
 
@@ -62,14 +167,23 @@ class RAGEngine:
         # Build the prompt
         prompt = self._build_prompt(question, context)
 
-        # Build system prompt
-        system_prompt = self._build_system_prompt()
-
         # Generate response
-        if stream:
-            return self.llm_service.generate_stream(prompt, system_prompt)
-        else:
-            return self.llm_service.generate(prompt, system_prompt)
+        answer = self.llm_service.generate(prompt, system_prompt)
+        self.answer_cache.put(cache_key, answer)
+        return answer
+
+    def _stream_answer(
+        self, question: str, search: Future, cache_key: str
+    ) -> Generator[str, None, None]:
+        """Stream the answer once retrieval finishes, caching it on completion."""
+        context = self._build_context(search.result())
+        prompt = self._build_prompt(question, context)
+
+        parts = []
+        for chunk in self.llm_service.generate_stream(prompt, self._system_prompt):
+            parts.append(chunk)
+            yield chunk
+        self.answer_cache.put(cache_key, "".join(parts))
 
     def _build_context(self, results: list[dict]) -> str:
         """Build context string from search results."""
@@ -98,12 +212,13 @@ class RAGEngine:
 
 ## Answer"""
 
-    def _build_system_prompt(self) -> str:
+    @staticmethod
+    def _build_system_prompt(instructions: str | None) -> str:
         """Build the system prompt, incorporating instructions if available."""
         base_prompt = "You are a helpful assistant that answers questions based on the provided context documents."
 
-        if self.instructions:
-            return f"{self.instructions}\n\nAdditional guidelines:\n- Always base your answers on the provided context\n- If information is not in the context, clearly state that\n- Cite the source documents when relevant"
+        if instructions:
+            return f"{instructions}\n\nAdditional guidelines:\n- Always base your answers on the provided context\n- If information is not in the context, clearly state that\n- Cite the source documents when relevant"
         else:
             return f"{base_prompt}\n\n- Always base your answers on the provided context\n- If information is not in the context, clearly state that\n- Cite the source documents when relevant"
 
@@ -1,5 +1,7 @@
 """Example Python module for testing RAG indexing."""
 
+import os
+
 class DataProcessor:
     """A class that processes various types of data."""
 
@@ -19,17 +21,20 @@ class DataProcessor:
             filepath: Path to the file to process
 
         Returns:
-            Dictionary containing processing results
+            Dictionary containing processing results (length is in bytes)
         """
-        # Read the file
-        with open(filepath, 'r') as f:
-            content = f.read()
+        # Size comes from the file system; newlines are counted on raw
+        # byte blocks, so the file is never decoded or held in memory whole
+        length = os.stat(filepath).st_size
+        lines = 1
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                lines += block.count(b'\n')
 
-        # Process content
         result = {
             'filepath': filepath,
-            'length': len(content),
-            'lines': content.count('\n') + 1,
+            'length': length,
+            'lines': lines,
         }
 
         self.processed_count += 1
@@ -1,9 +1,20 @@
-"""Vector store for document embeddings using ChromaDB."""
+"""Vector stores for document embeddings (ChromaDB, USearch or exact search)."""
 
+import json
+import operator
+import os
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 
 from config import Config
@@ -11,50 +22,352 @@ from document_loader import Document
 from embeddings import EmbeddingService
 
 
-class VectorStore:
-    """ChromaDB-based vector store for document embeddings."""
+_document_fields = operator.attrgetter("id", "content", "metadata")
+
+# Fields a search loads for each hit by default
+SEARCH_FIELDS = ("documents", "metadatas", "distances")
+
+# Smallest add_documents call that gets a progress bar
+_PROGRESS_MIN_DOCS = 8
+
+# rich.progress.Progress, imported on first use
+_Progress = None
+
+
+def _progress_bar():
+    """Create a rich progress bar, importing rich the first time."""
+    global _Progress
+    if _Progress is None:
+        from rich.progress import Progress
+        _Progress = Progress
+    return _Progress()
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """Return L2-normalized float32 copies of one or more vectors.
+
+    On unit vectors cosine similarity is a plain dot product, so stores
+    can use inner-product indexes and skip the per-candidate norms.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.clip(norms, 1e-12, None)
+
+
+class VectorStore(ABC):
+    """Abstract base class for vector stores.
+
+    Subclasses store precomputed embeddings; embedding documents and
+    queries, and normalizing the vectors to unit length, is handled here.
+    """
+
+    # Whether _add may run on several threads at once
+    _concurrent_inserts = False
 
     def __init__(self, folder_path: str, embedding_service: EmbeddingService):
         self.folder_path = Path(folder_path).resolve()
         self.embedding_service = embedding_service
         self.index_path = self.folder_path / Config.INDEX_FOLDER
 
-        # Initialize ChromaDB with persistence
-        self.client = chromadb.PersistentClient(
-            path=str(self.index_path),
-            settings=Settings(anonymized_telemetry=False)
-        )
+        # Created on first search_async call
+        self._search_executor: ThreadPoolExecutor | None = None
+
+        # Repeated questions skip the embedding model; cached vectors are
+        # shared between calls, so they must not be modified
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+        # Ids of stored chunks, loaded on the first add_documents call
+        self._seen: set[str] | None = None
+
+    def add_documents(self, documents: list[Document], show_progress: bool = True):
+        """Add documents to the vector store.
+
+        Documents whose id is already stored are skipped before embedding.
+        """
+        if not documents:
+            return
+        seen = self._seen_ids()
+
+        # Fetch the fields of each document in one C-level call, keep the
+        # new ones, then transpose the rows into ids, contents and metadatas
+        rows = []
+        for row in map(_document_fields, documents):
+            if row[0] not in seen:
+                seen.add(row[0])
+                rows.append(row)
+        if not rows:
+            return
+        ids, contents, metadatas = map(list, zip(*rows))
+
+        # A bar is only worth its setup cost for larger batches on a terminal
+        use_bar = show_progress and len(contents) >= _PROGRESS_MIN_DOCS and sys.stdout.isatty()
+        progress = _progress_bar() if use_bar else None
+
+        try:
+            self._embed_and_add(ids, contents, metadatas, progress)
+        except BaseException:
+            # Some of these ids may not have been stored
+            self._seen = None
+            raise
+
+    def _embed_and_add(self, ids: list[str], contents: list[str], metadatas: list[dict], progress):
+        """Embed chunks in batches and store them, updating progress if given.
+
+        Chunks are embedded in batches of the embedding service's own
+        batch size, so providers can pack and parallelize requests. Each
+        embedded batch is split into INSERT_BATCH_SIZE inserts that run on
+        worker threads while the next batch is embedded. Stores that accept
+        concurrent inserts get INSERT_WORKERS threads, others one; waiting
+        for the oldest insert before submitting another bounds the work
+        queued behind the inserts.
+        """
+        embed_size = self.embedding_service.batch_size
+        insert_size = Config.INSERT_BATCH_SIZE
+        workers = Config.INSERT_WORKERS if self._concurrent_inserts else 1
+        with progress or nullcontext(), \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vector-insert") as executor:
+            if progress:
+                task = progress.add_task("Generating embeddings...", total=len(contents))
+            pending: deque[Future] = deque()
+            for start in range(0, len(contents), embed_size):
+                embeddings = _normalize(
+                    self.embedding_service.embed_texts(contents[start:start + embed_size])
+                )
+                for offset in range(0, len(embeddings), insert_size):
+                    end = min(offset + insert_size, len(embeddings))
+                    lo, hi = start + offset, start + end
+                    if len(pending) >= workers:
+                        pending.popleft().result()
+                    pending.append(executor.submit(
+                        self._add, ids[lo:hi], embeddings[offset:end], contents[lo:hi], metadatas[lo:hi]
+                    ))
+                if progress:
+                    progress.update(task, advance=len(embeddings))
+            for future in pending:
+                future.result()
+
+    def _seen_ids(self) -> set[str]:
+        """Return the ids of stored chunks, loading them on first use."""
+        if self._seen is None:
+            self._seen = set(self._stored_ids())
+        return self._seen
+
+    @abstractmethod
+    def _stored_ids(self) -> list[str]:
+        """Read the ids of all stored chunks."""
+        pass
+
+    @abstractmethod
+    def _add(self, ids: list[str], embeddings: np.ndarray, contents: list[str], metadatas: list[dict]):
+        """Store embedded chunks."""
+        pass
+
+    def delete_by_source(self, sources: list[str]):
+        """Delete all chunks that came from the given source files."""
+        # Deleted ids are not known here, so reload them on the next add
+        self._seen = None
+        self._delete_by_source(sources)
+        if self.count() == 0:
+            self._populated_marker.unlink(missing_ok=True)
+
+    @abstractmethod
+    def _delete_by_source(self, sources: list[str]):
+        """Delete the stored chunks of the given source files."""
+        pass
+
+    def search(self, query: str, top_k: int = None, include=SEARCH_FIELDS) -> list[dict]:
+        """Search for similar documents.
+
+        Each hit has the chunk "id" plus "content", "metadata" and
+        "distance". Pass a subset of SEARCH_FIELDS as include to skip
+        loading fields that are not needed, e.g. include=("distances",)
+        for a first-stage filter; skipped fields are "", {} or 0.
+        """
+        top_k = top_k or Config.TOP_K_RESULTS
+        return self._query(self._query_vectors([query])[0], top_k, tuple(include))
+
+    def _query_vectors(self, queries: list[str]) -> np.ndarray:
+        """Return normalized query embeddings, one row per query.
+
+        The last QUERY_CACHE_SIZE query vectors are kept in memory; misses
+        are embedded together and never go into the chunk embedding cache.
+        """
+        with self._query_cache_lock:
+            vectors = {}
+            for query in queries:
+                if query in self._query_cache:
+                    self._query_cache.move_to_end(query)
+                    vectors[query] = self._query_cache[query]
+
+        missing = [query for query in dict.fromkeys(queries) if query not in vectors]
+        if missing:
+            embedded = _normalize(self.embedding_service.embed_queries(missing))
+            vectors.update(zip(missing, embedded))
+            with self._query_cache_lock:
+                self._query_cache.update(zip(missing, embedded))
+                while len(self._query_cache) > Config.QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+
+        return np.stack([vectors[query] for query in queries])
+
+    def search_batch(
+        self,
+        queries: list[str],
+        top_k: int = None,
+        include=SEARCH_FIELDS
+    ) -> list[list[dict]]:
+        """Search for several queries at once, returning one result list per query.
+
+        Queries not in the query cache are embedded in a single call, and
+        all of them are looked up together.
+        """
+        if not queries:
+            return []
+        top_k = top_k or Config.TOP_K_RESULTS
+        return self._query_batch(self._query_vectors(queries), top_k, tuple(include))
+
+    def _query(self, query_embedding: np.ndarray, top_k: int, include: tuple) -> list[dict]:
+        """Return the top_k nearest chunks as result dicts."""
+        return self._query_batch(query_embedding[np.newaxis], top_k, include)[0]
+
+    @abstractmethod
+    def _query_batch(self, query_embeddings: np.ndarray, top_k: int, include: tuple) -> list[list[dict]]:
+        """Return the top_k nearest chunks for each row of query_embeddings."""
+        pass
+
+    def search_async(self, query: str, top_k: int = None, include=SEARCH_FIELDS) -> Future:
+        """Start a search on a background thread and return its future."""
+        if self._search_executor is None:
+            self._search_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="vector-search"
+            )
+        return self._search_executor.submit(self.search, query, top_k, include)
+
+    def persist(self):
+        """Write pending changes to disk, then mark the index populated.
+
+        Subclasses that buffer changes save them before calling this.
+        """
+        if self.count() > 0:
+            self._populated_marker.touch()
+
+    @abstractmethod
+    def clear(self):
+        """Clear all documents from the store.
+
+        Subclasses call this to also reset cached query embeddings, known
+        ids and the populated marker.
+        """
+        with self._query_cache_lock:
+            self._query_cache.clear()
+        self._populated_marker.unlink(missing_ok=True)
+        self._seen = set()
+
+    @abstractmethod
+    def count(self) -> int:
+        """Get the number of documents in the store."""
+        pass
+
+    @property
+    def _populated_marker(self) -> Path:
+        """Sentinel file written once documents have been added."""
+        return self.index_path / ".populated"
+
+    def exists(self) -> bool:
+        """Check if the index exists and has documents.
+
+        Checks the populated marker instead of counting documents; indexes
+        built before the marker existed are counted once and then marked.
+        """
+        if self._populated_marker.exists():
+            return True
+        if self.index_path.exists() and self.count() > 0:
+            self._populated_marker.touch()
+            return True
+        return False
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB-based vector store for document embeddings."""
+
+    # Chroma serializes writes itself, so batches can be prepared in parallel
+    _concurrent_inserts = True
+
+    # Persistent clients by index path, shared across instances
+    _clients: dict[str, "chromadb.ClientAPI"] = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(self, folder_path: str, embedding_service: EmbeddingService):
+        super().__init__(folder_path, embedding_service)
+
+        # Stores on the same folder share one persistent client
+        self.client = self._get_client(str(self.index_path))
 
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
             name="documents",
-            metadata={"hnsw:space": "cosine"}
+            metadata=self._collection_metadata()
         )
 
+    @classmethod
+    def _get_client(cls, path: str):
+        """Return the cached persistent client for path, creating it once."""
+        with cls._clients_lock:
+            client = cls._clients.get(path)
+            if client is None:
+                client = chromadb.PersistentClient(
+                    path=path,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+                cls._clients[path] = client
+            return client
+
+    @classmethod
+    def close(cls, path: Optional[str] = None):
+        """Drop the cached client for path, or all cached clients.
+
+        Stores created afterwards open a fresh client; existing stores keep
+        the one they have.
+        """
+        with cls._clients_lock:
+            if path is None:
+                cls._clients.clear()
+            else:
+                cls._clients.pop(str(Path(path).resolve()), None)
+
+    @staticmethod
+    def _collection_metadata() -> dict:
+        """HNSW settings for the collection.
+
+        ChromaDB fixes these when the collection is created, so changing
+        them only affects an existing index after clear() (index --rebuild).
+        Vectors are normalized, so inner product ranks like cosine; older
+        collections created with "cosine" give the same results.
+        """
+        return {
+            "hnsw:space": "ip",
+            "hnsw:M": Config.HNSW_M,
+            "hnsw:construction_ef": Config.HNSW_EF_CONSTRUCTION,
+            "hnsw:search_ef": Config.HNSW_EF_SEARCH,
+            "hnsw:num_threads": Config.HNSW_NUM_THREADS,
+        }
+
     def add_documents(self, documents: list[Document], show_progress: bool = True):
-        """Add documents to the vector store."""
-        if not documents:
-            return
+        """Add documents; Chroma writes them to disk as they are added."""
+        super().add_documents(documents, show_progress)
+        if documents:
+            self._populated_marker.touch()
 
-        # Extract content and metadata
-        ids = [doc.id for doc in documents]
-        contents = [doc.content for doc in documents]
-        metadatas = [doc.metadata for doc in documents]
-
-        # Generate embeddings
-        if show_progress:
-            from rich.progress import Progress
-            with Progress() as progress:
-                task = progress.add_task("Generating embeddings...", total=1)
-                embeddings = self.embedding_service.embed_texts(contents)
-                progress.update(task, completed=1)
-        else:
-            embeddings = self.embedding_service.embed_texts(contents)
+    def _add(self, ids: list[str], embeddings: np.ndarray, contents: list[str], metadatas: list[dict]):
+        """Add embedded chunks to the collection.
 
-        # Add to collection in batches
-        batch_size = 500
+        Each embedded batch goes in as one add() call; it is only split if
+        it exceeds the client's maximum batch size.
+        """
+        batch_size = self.client.get_max_batch_size()
         for i in range(0, len(ids), batch_size):
-            end = min(i + batch_size, len(ids))
+            end = i + batch_size
             self.collection.add(
                 ids=ids[i:end],
                 embeddings=embeddings[i:end],
@@ -62,45 +375,391 @@ class VectorStore:
                 metadatas=metadatas[i:end]
             )
 
-    def search(self, query: str, top_k: int = None) -> list[dict]:
-        """Search for similar documents."""
-        top_k = top_k or Config.TOP_K_RESULTS
+    def _stored_ids(self) -> list[str]:
+        return self.collection.get(include=[])["ids"]
 
-        # Generate query embedding
-        query_embedding = self.embedding_service.embed_query(query)
+    def _delete_by_source(self, sources: list[str]):
+        batch_size = 500
+        for i in range(0, len(sources), batch_size):
+            self.collection.delete(where={"source": {"$in": sources[i:i + batch_size]}})
 
-        # Search
+    def _query_batch(self, query_embeddings: np.ndarray, top_k: int, include: tuple) -> list[list[dict]]:
+        """Query the collection (the float32 array is passed to Chroma as-is)."""
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=top_k,
-            include=["documents", "metadatas", "distances"]
+            include=list(include)
         )
+        return [self._format_results(results, row) for row in range(len(query_embeddings))]
 
-        # Format results
-        formatted_results = []
-        if results["documents"] and results["documents"][0]:
-            for i in range(len(results["documents"][0])):
-                formatted_results.append({
-                    "content": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "distance": results["distances"][0][i] if results["distances"] else 0
-                })
+    @staticmethod
+    def _format_results(results: dict, row: int = 0) -> list[dict]:
+        """Turn one query's hits in a Chroma result into result dicts.
 
-        return formatted_results
+        Fields that were not included default to "", {} and 0.
+        """
+        ids = results["ids"][row] if results["ids"] else []
+        documents = results["documents"][row] if results.get("documents") else [""] * len(ids)
+        metadatas = results["metadatas"][row] if results.get("metadatas") else [{}] * len(ids)
+        distances = results["distances"][row] if results.get("distances") else [0] * len(ids)
+        return [
+            {"id": chunk_id, "content": content, "metadata": metadata, "distance": distance}
+            for chunk_id, content, metadata, distance in zip(ids, documents, metadatas, distances)
+        ]
 
     def clear(self):
         """Clear all documents from the collection."""
+        super().clear()
         # Delete and recreate collection
         self.client.delete_collection("documents")
         self.collection = self.client.create_collection(
             name="documents",
-            metadata={"hnsw:space": "cosine"}
+            metadata=self._collection_metadata()
         )
 
     def count(self) -> int:
         """Get the number of documents in the store."""
         return self.collection.count()
 
-    def exists(self) -> bool:
-        """Check if the index exists and has documents."""
-        return self.index_path.exists() and self.count() > 0
+
+class SidecarVectorStore(VectorStore):
+    """Base class for stores that keep chunk text in a SQLite sidecar.
+
+    Chunk ids, text and metadata live in docs.sqlite3, keyed by an integer
+    that subclasses use to address the vector. Changes are written to disk
+    by persist().
+    """
+
+    DOCS_FILE = "docs.sqlite3"
+
+    # Stay well below SQLite's bound-parameter limit on older builds
+    _QUERY_BATCH = 500
+
+    def __init__(self, folder_path: str, embedding_service: EmbeddingService):
+        super().__init__(folder_path, embedding_service)
+        self.index_path.mkdir(parents=True, exist_ok=True)
+
+        # Searches may run on the search_async worker thread
+        self._conn = sqlite3.connect(str(self.index_path / self.DOCS_FILE), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "key INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, source TEXT NOT NULL, "
+            "content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source)")
+        self._conn.commit()
+
+    @abstractmethod
+    def _add_vectors(self, keys: np.ndarray, embeddings: np.ndarray):
+        """Store float32 vectors under their integer keys."""
+        pass
+
+    @abstractmethod
+    def _remove_vectors(self, keys: np.ndarray):
+        """Drop the vectors stored under the given keys."""
+        pass
+
+    @abstractmethod
+    def _search_vectors(self, query_embeddings: np.ndarray, top_k: int) -> list[tuple[list, list]]:
+        """Return (keys, distances) of the nearest vectors for each query."""
+        pass
+
+    @abstractmethod
+    def _save_vectors(self):
+        """Write the vectors to disk."""
+        pass
+
+    @abstractmethod
+    def _reset_vectors(self):
+        """Drop all vectors, in memory and on disk."""
+        pass
+
+    def _add(self, ids: list[str], embeddings: np.ndarray, contents: list[str], metadatas: list[dict]):
+        """Add embedded chunks; add_documents has already dropped stored ids."""
+        first_key = self._conn.execute("SELECT COALESCE(MAX(key), -1) + 1 FROM chunks").fetchone()[0]
+        keys = np.arange(first_key, first_key + len(ids), dtype=np.uint64)
+        self._conn.executemany(
+            "INSERT INTO chunks (key, id, source, content, metadata) VALUES (?, ?, ?, ?, ?)",
+            (
+                (int(key), chunk_id, metadata.get("source", ""), content, json.dumps(metadata))
+                for key, chunk_id, content, metadata in zip(keys, ids, contents, metadatas)
+            )
+        )
+        self._add_vectors(keys, np.asarray(embeddings, dtype=np.float32))
+
+    def _stored_ids(self) -> list[str]:
+        return [row[0] for row in self._conn.execute("SELECT id FROM chunks")]
+
+    def _delete_by_source(self, sources: list[str]):
+        for i in range(0, len(sources), self._QUERY_BATCH):
+            batch = sources[i:i + self._QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            keys = [
+                row[0] for row in
+                self._conn.execute(f"SELECT key FROM chunks WHERE source IN ({placeholders})", batch)
+            ]
+            if keys:
+                self._remove_vectors(np.asarray(keys, dtype=np.uint64))
+                self._conn.execute(f"DELETE FROM chunks WHERE source IN ({placeholders})", batch)
+
+    def _query_batch(self, query_embeddings: np.ndarray, top_k: int, include: tuple) -> list[list[dict]]:
+        """Find the nearest vectors and hydrate hits from the sidecar."""
+        if self.count() == 0:
+            return [[] for _ in query_embeddings]
+
+        hits = self._search_vectors(np.asarray(query_embeddings, dtype=np.float32), top_k)
+
+        # Only read the text and metadata columns if they were asked for
+        content_column = "content" if "documents" in include else "''"
+        metadata_column = "metadata" if "metadatas" in include else "NULL"
+        unique_keys = list({key for keys, _ in hits for key in keys})
+        rows = {}
+        for i in range(0, len(unique_keys), self._QUERY_BATCH):
+            batch = unique_keys[i:i + self._QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(
+                (key, (chunk_id, content, metadata)) for key, chunk_id, content, metadata in
+                self._conn.execute(
+                    f"SELECT key, id, {content_column}, {metadata_column} FROM chunks "
+                    f"WHERE key IN ({placeholders})",
+                    batch
+                )
+            )
+
+        with_distances = "distances" in include
+        results = []
+        for keys, distances in hits:
+            formatted_results = []
+            for key, distance in zip(keys, distances):
+                if key not in rows:
+                    continue
+                chunk_id, content, metadata = rows[key]
+                formatted_results.append({
+                    "id": chunk_id,
+                    "content": content,
+                    "metadata": json.loads(metadata) if metadata is not None else {},
+                    "distance": distance if with_distances else 0
+                })
+            results.append(formatted_results)
+        return results
+
+    def persist(self):
+        """Save the vectors, then commit the sidecar.
+
+        Vectors go first: if saving is interrupted, the sidecar still
+        matches the vectors on disk, and extra vectors without a sidecar
+        row are never returned.
+        """
+        self._save_vectors()
+        self._conn.commit()
+        super().persist()
+
+    def clear(self):
+        """Clear all documents from the store."""
+        super().clear()
+        self._conn.execute("DELETE FROM chunks")
+        self._conn.commit()
+        self._reset_vectors()
+
+
+class USearchVectorStore(SidecarVectorStore):
+    """In-memory USearch HNSW index with a SQLite sidecar for chunk text.
+
+    Searching runs USearch's SIMD distance kernels directly instead of going
+    through ChromaDB. The graph is kept in index.usearch. Below
+    HNSW_MIN_DOCS vectors the graph is skipped and every vector is scored,
+    which is exact and faster at that size.
+    """
+
+    INDEX_FILE = "index.usearch"
+
+    def __init__(self, folder_path: str, embedding_service: EmbeddingService):
+        super().__init__(folder_path, embedding_service)
+        try:
+            from usearch.index import Index
+        except ImportError as e:
+            raise ImportError("The usearch vector backend requires: pip install usearch") from e
+        self._index_class = Index
+        self._index_file = self.index_path / self.INDEX_FILE
+
+        if self._index_file.exists():
+            # restore() reads the dimension and metric from the file itself
+            self.index = Index.restore(str(self._index_file))
+        else:
+            self.index = self._new_index()
+
+    def _new_index(self):
+        """Create an empty index with the configured HNSW parameters.
+
+        Vectors are passed in as float32 and quantized to USEARCH_DTYPE by
+        USearch on insert.
+        """
+        dtype = Config.USEARCH_DTYPE
+        return self._index_class(
+            ndim=self.embedding_service.dimension,
+            # USearch's int8 inner product is not rescaled to [-1, 1], while
+            # its int8 cosine is; for unit vectors the two rank the same
+            metric="cos" if dtype == "i8" else "ip",
+            dtype=dtype,
+            connectivity=Config.HNSW_M,
+            expansion_add=Config.HNSW_EF_CONSTRUCTION,
+            expansion_search=Config.HNSW_EF_SEARCH
+        )
+
+    def _add_vectors(self, keys: np.ndarray, embeddings: np.ndarray):
+        self.index.add(keys, embeddings)
+
+    def _remove_vectors(self, keys: np.ndarray):
+        self.index.remove(keys)
+
+    def _search_vectors(self, query_embeddings: np.ndarray, top_k: int) -> list[tuple[list, list]]:
+        exact = len(self.index) < Config.HNSW_MIN_DOCS
+        matches = self.index.search(query_embeddings, top_k, exact=exact)
+        if len(query_embeddings) == 1:
+            # A single query comes back as flat, already trimmed Matches
+            return [(matches.keys.tolist(), matches.distances.tolist())]
+        return [
+            (keys[:count].tolist(), distances[:count].tolist())
+            for keys, distances, count in zip(matches.keys, matches.distances, matches.counts)
+        ]
+
+    def _save_vectors(self):
+        self.index.save(str(self._index_file))
+
+    def _reset_vectors(self):
+        self._index_file.unlink(missing_ok=True)
+        self.index = self._new_index()
+
+    def count(self) -> int:
+        """Get the number of documents in the store."""
+        return len(self.index)
+
+
+class BruteForceVectorStore(SidecarVectorStore):
+    """Exact search over a float32 matrix, with a SQLite sidecar for chunk text.
+
+    For small corpora a matrix product beats walking an HNSW graph and
+    never misses a neighbour. Row i of the matrix holds the vector with
+    key i; rows of deleted chunks are masked out, and dropped when saving
+    once they pass _COMPACT_FRACTION of the matrix. The matrix is saved as
+    vectors.npy and memory-mapped on load. It stays float32 because NumPy
+    has no half-precision BLAS kernels.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+
+    # Share of dead rows at which saving compacts the matrix
+    _COMPACT_FRACTION = 0.25
+
+    def __init__(self, folder_path: str, embedding_service: EmbeddingService):
+        super().__init__(folder_path, embedding_service)
+        self._vectors_file = self.index_path / self.VECTORS_FILE
+        self._reset_vectors(unlink=False)
+
+        if self._vectors_file.exists():
+            self._matrix = np.load(self._vectors_file, mmap_mode="r")
+            self._size = len(self._matrix)
+            self._live = np.zeros(self._size, dtype=bool)
+            keys = np.fromiter(
+                (row[0] for row in self._conn.execute("SELECT key FROM chunks WHERE key < ?", (self._size,))),
+                dtype=np.int64
+            )
+            self._live[keys] = True
+            self._count = len(keys)
+
+    def _reserve(self, rows: int):
+        """Make the matrix writable in memory with room for rows vectors."""
+        if rows <= len(self._matrix) and self._matrix.flags.writeable:
+            return
+        capacity = max(rows, 2 * len(self._matrix), 1024)
+        matrix = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._matrix, self._live = matrix, live
+
+    def _add_vectors(self, keys: np.ndarray, embeddings: np.ndarray):
+        rows = keys.astype(np.int64)
+        self._reserve(int(rows.max()) + 1)
+        self._matrix[rows] = embeddings
+        self._count += int(np.count_nonzero(~self._live[rows]))
+        self._live[rows] = True
+        self._size = max(self._size, int(rows.max()) + 1)
+        self._dirty = True
+
+    def _remove_vectors(self, keys: np.ndarray):
+        rows = keys.astype(np.int64)
+        rows = rows[rows < self._size]
+        self._count -= int(np.count_nonzero(self._live[rows]))
+        self._live[rows] = False
+
+    def _search_vectors(self, query_embeddings: np.ndarray, top_k: int) -> list[tuple[list, list]]:
+        scores = query_embeddings @ self._matrix[:self._size].T
+        scores[:, ~self._live[:self._size]] = -np.inf
+
+        k = min(top_k, self._count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        distances = 1.0 - np.take_along_axis(top_scores, order, axis=1)
+        return list(zip(top.tolist(), distances.tolist()))
+
+    def _save_vectors(self):
+        if self._size - self._count > self._COMPACT_FRACTION * self._size:
+            self._compact()
+        if not self._dirty:
+            return
+        # Write a new file and swap it in; the old one may be memory-mapped
+        tmp_file = self._vectors_file.with_suffix(".tmp.npy")
+        np.save(tmp_file, self._matrix[:self._size])
+        os.replace(tmp_file, self._vectors_file)
+        self._dirty = False
+
+    def _compact(self):
+        """Drop dead rows, renumbering the live keys to 0..count-1.
+
+        The sidecar keys are remapped in the same (uncommitted) transaction
+        that persist() commits right after the compacted matrix is saved.
+        """
+        rows = np.flatnonzero(self._live[:self._size])
+        # Ascending order never moves a key onto one that is still in use
+        self._conn.executemany(
+            "UPDATE chunks SET key = ? WHERE key = ?",
+            ((new, int(old)) for new, old in enumerate(rows) if new != old)
+        )
+        self._matrix = self._matrix[rows]
+        self._live = np.ones(len(rows), dtype=bool)
+        self._size = self._count = len(rows)
+        self._dirty = True
+
+    def _reset_vectors(self, unlink: bool = True):
+        if unlink:
+            self._vectors_file.unlink(missing_ok=True)
+        self._matrix = np.empty((0, self.embedding_service.dimension), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._count = 0
+        self._dirty = False
+
+    def count(self) -> int:
+        """Get the number of documents in the store."""
+        return self._count
+
+
+def get_vector_store(
+    folder_path: str,
+    embedding_service: EmbeddingService,
+    backend: Optional[str] = None
+) -> VectorStore:
+    """Factory function to get the configured vector store."""
+    backend = backend or Config.VECTOR_BACKEND
+
+    if backend == "chroma":
+        return ChromaVectorStore(folder_path, embedding_service)
+    elif backend == "usearch":
+        return USearchVectorStore(folder_path, embedding_service)
+    elif backend == "exact":
+        return BruteForceVectorStore(folder_path, embedding_service)
+    else:
+        raise ValueError(f"Unknown vector backend: {backend}")